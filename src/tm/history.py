@@ -0,0 +1,178 @@
+import logging
+from bisect import bisect_left, bisect_right, insort
+from typing import Optional
+
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+HISTORY_COLUMNS = ["map_id", "player_id", "timestamp", "record_time", "record_medal"]
+
+
+def _timestamp(t) -> pd.Timestamp:
+    """
+    Normalizes a timestamp-like value to a UTC pd.Timestamp, matching the records timestamps.
+
+    :param t: str, datetime or pd.Timestamp.
+    :return: tz-aware (UTC) pd.Timestamp.
+    """
+    t = pd.Timestamp(t)
+    return t.tz_localize("UTC") if t.tzinfo is None else t.tz_convert("UTC")
+
+
+class RecordHistory:
+    """
+    Append-only history of personal bests, keyed on (map_id, player_id, timestamp).
+
+    Keeps two sorted indexes so queries bisect instead of scanning:
+    - by (map_id, player_id, timestamp), for progressions and leaderboards.
+    - by (timestamp, map_id, player_id), for time windows.
+    """
+
+    def __init__(self, path: str = "data/record_history.csv"):
+        self.path = path
+        # (map_id, player_id, timestamp) -> (record_time, record_medal)
+        self._records: dict[tuple[str, str, pd.Timestamp], tuple[int, int]] = {}
+        self._by_key: list[tuple[str, str, pd.Timestamp]] = []
+        self._by_time: list[tuple[pd.Timestamp, str, str]] = []
+        # map_id -> sorted player_ids with at least one record on the map
+        self._map_players: dict[str, list[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_key)
+
+    @classmethod
+    def load(cls, path: str = "data/record_history.csv") -> "RecordHistory":
+        """
+        Loads the history from a CSV file, or returns an empty history if it does not exist.
+
+        :param path: path of the history CSV.
+        :return: RecordHistory.
+        """
+        history = cls(path=path)
+        try:
+            df = pd.read_csv(path, parse_dates=["timestamp"])
+        except FileNotFoundError:
+            log.info(f"No {path} found, starting new record history.")
+            return history
+        history.add(df)
+        return history
+
+    def save(self) -> None:
+        """
+        Writes the history to self.path, sorted by (map_id, player_id, timestamp).
+        """
+        self.to_frame().to_csv(self.path, index=False)
+
+    def add(self, records: pd.DataFrame) -> int:
+        """
+        Adds records to the history, skipping any (map_id, player_id, timestamp) already present.
+
+        :param records: DataFrame with (at least) the columns in HISTORY_COLUMNS, e.g. 'map_records'.
+        :return: (int) number of new records added.
+        """
+        added = 0
+        for row in records[HISTORY_COLUMNS].itertuples(index=False):
+            added += self._insert(
+                row.map_id,
+                row.player_id,
+                _timestamp(row.timestamp),
+                int(row.record_time),
+                int(row.record_medal),
+            )
+        if added:
+            log.info(f"Added {added} new records to history.")
+        return added
+
+    def _insert(
+        self,
+        map_id: str,
+        player_id: str,
+        timestamp: pd.Timestamp,
+        record_time: int,
+        record_medal: int,
+    ) -> bool:
+        key = (map_id, player_id, timestamp)
+        if key in self._records:
+            return False
+        self._records[key] = (record_time, record_medal)
+        insort(self._by_key, key)
+        insort(self._by_time, (timestamp, map_id, player_id))
+        players = self._map_players.setdefault(map_id, [])
+        ix = bisect_left(players, player_id)
+        if ix == len(players) or players[ix] != player_id:
+            players.insert(ix, player_id)
+        return True
+
+    def _row(self, key: tuple[str, str, pd.Timestamp]) -> dict:
+        map_id, player_id, timestamp = key
+        record_time, record_medal = self._records[key]
+        return {
+            "map_id": map_id,
+            "player_id": player_id,
+            "timestamp": timestamp,
+            "record_time": record_time,
+            "record_medal": record_medal,
+        }
+
+    def _frame(self, keys: list[tuple[str, str, pd.Timestamp]]) -> pd.DataFrame:
+        return pd.DataFrame([self._row(k) for k in keys], columns=HISTORY_COLUMNS)
+
+    def _player_range(self, map_id: str, player_id: str) -> tuple[int, int]:
+        # pd.Timestamp.min/max are tz-naive, so bound on the (map_id, player_id) prefix instead
+        lo = bisect_left(self._by_key, (map_id, player_id))
+        hi = bisect_left(self._by_key, (map_id, player_id + "\0"), lo=lo)
+        return lo, hi
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        :return: the full history as a DataFrame, sorted by (map_id, player_id, timestamp).
+        """
+        return self._frame(self._by_key)
+
+    def progression(self, map_id: str, player_id: str) -> pd.DataFrame:
+        """
+        Gets the personal-best progression of a player on a map.
+
+        :param map_id: map id.
+        :param player_id: player id.
+        :return: DataFrame of the player's records on the map, oldest first.
+        """
+        lo, hi = self._player_range(map_id, player_id)
+        return self._frame(self._by_key[lo:hi])
+
+    def leaderboard(self, map_id: str, as_of: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        """
+        Gets the leaderboard of a map as it stood at a given time.
+        Each player's latest record at or before as_of is their personal best at that time.
+
+        :param map_id: map id.
+        :param as_of: time of the leaderboard (inclusive). If None, the latest leaderboard.
+        :return: DataFrame of one record per player, sorted by record_time increasing.
+        """
+        keys = []
+        for player_id in self._map_players.get(map_id, []):
+            lo, hi = self._player_range(map_id, player_id)
+            if as_of is not None:
+                hi = bisect_right(
+                    self._by_key, (map_id, player_id, _timestamp(as_of)), lo=lo, hi=hi
+                )
+            if hi > lo:
+                keys.append(self._by_key[hi - 1])
+        return (
+            self._frame(keys)
+            .sort_values(["record_time", "timestamp"], kind="stable")
+            .reset_index(drop=True)
+        )
+
+    def window(self, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+        """
+        Gets the records set within a time window.
+
+        :param start: start of the window (inclusive).
+        :param end: end of the window (exclusive).
+        :return: DataFrame of records set in [start, end), sorted by timestamp.
+        """
+        lo = bisect_left(self._by_time, (_timestamp(start),))
+        hi = bisect_left(self._by_time, (_timestamp(end),), lo=lo)
+        return self._frame([(m, p, t) for t, m, p in self._by_time[lo:hi]])
@@ -2,6 +2,7 @@ from datetime import datetime
 import pandas as pd
 
 from tm.db import update_oracle_db
+from tm.history import RecordHistory
 from tm.maps import get_maps
 from tm.players import get_players
 from tm.nadeo_client import NadeoClient
@@ -133,6 +134,7 @@ def update() -> bool:
     """
     Updates the database with the latest map records and stats.
     Saves the records and stats DataFrames to CSV files in records/.
+    Appends new personal bests to the record history in data/record_history.csv.
     :return: (bool) True if successful.
     """
     dfs = map_records()
@@ -142,4 +144,7 @@ def update() -> bool:
         print(f"Updated database with {len(dfs['map_records'])} records at {t}.")
         dfs["map_records"].to_csv(f"records/map_records_{t}.csv", index=False)
         dfs["map_stats"].to_csv(f"records/map_stats_{t}.csv", index=False)
+        history = RecordHistory.load()
+        history.add(dfs["map_records"])
+        history.save()
     return ok